@@ -0,0 +1,3 @@
+from .status_api import StatusAPI, StatusSnapshot
+
+__all__ = ['StatusAPI', 'StatusSnapshot']
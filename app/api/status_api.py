@@ -0,0 +1,117 @@
+import asyncio
+import json
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+from app.config import Config
+from app.status import Status
+from app.utils import HTTPRequest, HTTPResponse, HTTPServer, SingletonMeta
+
+logger = logging.getLogger(__name__)
+
+
+def _isoformat(timestamp: Optional[float]) -> Optional[str]:
+    if timestamp is None:
+        return None
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).isoformat()
+
+
+@dataclass(frozen=True)
+class StatusSnapshot:
+    version: int
+    etag: str
+    body: bytes
+
+
+class StatusAPI(metaclass=SingletonMeta):
+    """Read-only JSON view of `Status`, served from a snapshot rebuilt only on state changes.
+
+    `GET /status` honours `If-None-Match`; with `?wait=SECONDS` and a matching ETag
+    the request is held until the next change (or the timeout, answered with 304).
+    """
+
+    snapshot: StatusSnapshot
+
+    def __init__(self, max_wait: float = 60) -> None:
+        self.max_wait = max_wait
+        self.__boot_id = f"{int(time.time()):x}"
+        self.__changed = asyncio.Event()
+        self.__servers: list[HTTPServer] = []
+
+        self.rebuild()
+        Status().add_change_listener(self.rebuild)
+
+    def rebuild(self) -> None:
+        status = Status()
+        groups: dict[str, list[dict[str, Any]]] = {}
+        for group, name, value in status.status_rows():
+            groups.setdefault(str(group), []).append({
+                "name": name,
+                "value": value,
+                "changed_at": _isoformat(status.changed_at.get((group, name))),
+            })
+
+        body = {
+            "version": status.version,
+            "generated_at": _isoformat(time.time()),
+            "groups": groups,
+            "failed": [str(name) for name in status.statuses_fail],
+        }
+        self.snapshot = StatusSnapshot(
+            status.version,
+            f'"{self.__boot_id}-{status.version}"',
+            json.dumps(body, ensure_ascii=False).encode()
+        )
+
+        # Wake every long-poll waiter, later ones wait on a fresh event
+        self.__changed.set()
+        self.__changed = asyncio.Event()
+
+    def _response(self, snapshot: StatusSnapshot, if_none_match: Optional[str]) -> HTTPResponse:
+        headers = {"ETag": snapshot.etag, "Cache-Control": "no-cache"}
+        if if_none_match == snapshot.etag:
+            return HTTPResponse(304, headers=headers)
+        return HTTPResponse(200, snapshot.body, headers=headers)
+
+    async def handle(self, request: HTTPRequest) -> HTTPResponse:
+        if request.path not in ("/", "/status"):
+            return HTTPResponse(404)
+        if request.method != "GET":
+            return HTTPResponse(405)
+
+        if_none_match = request.headers.get("if-none-match")
+        wait = min(float(request.query.get("wait", 0)), self.max_wait)
+
+        snapshot = self.snapshot
+        if wait > 0 and if_none_match == snapshot.etag:
+            try:
+                await asyncio.wait_for(self.__changed.wait(), wait)
+            except asyncio.TimeoutError:
+                pass
+            snapshot = self.snapshot
+
+        return self._response(snapshot, if_none_match)
+
+    def start_serving(self) -> None:
+        logger.info("Starting status API")
+        loop = asyncio.get_event_loop()
+        loop.create_task(self.start(Config.status_api_host, Config.status_api_port, Config.status_api_socket))
+
+    async def start(self, host: str, port: int, socket_path: str) -> None:
+        if port > 0:
+            server = HTTPServer(self.handle)
+            await server.start(host, port)
+            self.__servers.append(server)
+
+        if socket_path:
+            server = HTTPServer(self.handle)
+            await server.start_unix(socket_path)
+            self.__servers.append(server)
+
+    async def stop(self) -> None:
+        for server in self.__servers:
+            await server.stop()
+        self.__servers = []
@@ -1,7 +1,10 @@
 import asyncio
 import logging
+import signal
 from typing import Optional
+from urllib.parse import urlsplit
 
+from telegram import Update
 from telegram.constants import ParseMode
 from telegram.ext import Application, CommandHandler
 
@@ -10,18 +13,27 @@ from app.status.status import Status
 from app.utils import SingletonMeta
 
 from . import handlers
+from .webhook import WebhookReceiver
 
 logger = logging.getLogger(__name__)
 
 
 class Bot(metaclass=SingletonMeta):
     loop: Optional[asyncio.AbstractEventLoop]
+    webhook: Optional[WebhookReceiver]
 
     def __init__(self) -> None:
         logger.info("Initializing bot")
         telegram_bot_token = Config.telegram_bot_token
-        self.application = Application.builder().token(telegram_bot_token).build()
+        self.application = (
+            Application.builder()
+            .token(telegram_bot_token)
+            .base_url(Config.telegram_base_url)
+            .connection_pool_size(Config.telegram_pool_size)
+            .build()
+        )
         self.loop = None
+        self.webhook = None
         self.__register_handlers__()
 
     def __register_handlers__(self) -> None:
@@ -30,6 +42,10 @@ class Bot(metaclass=SingletonMeta):
             'start', handlers.start_cmd, block=False))
         self.application.add_handler(CommandHandler(
             'status', handlers.status_cmd, block=False))
+        self.application.add_handler(CommandHandler(
+            'energy', handlers.energy_cmd, block=False))
+        self.application.add_handler(CommandHandler(
+            'chart', handlers.chart_cmd, block=False))
         self.application.add_handler(CommandHandler(
             'help', handlers.help_cmd, block=False))
 
@@ -46,12 +62,56 @@ class Bot(metaclass=SingletonMeta):
         logger.debug("Status update sent")
 
     def start(self) -> None:
-        logger.info('Starting bot polling')
         self.loop = asyncio.get_event_loop()
         print(f"bot_start -> {self.loop}")
+
+        if Config.telegram_webhook_url:
+            self.__run_webhook(self.loop)
+            return
+
+        logger.info('Starting bot polling')
         self.application.run_polling()
         logger.debug('Run polling exited')
 
+    async def start_webhook(self) -> None:
+        if not Config.telegram_webhook_secret:
+            raise ValueError("Webhook mode requires TELEGRAM_WEBHOOK_SECRET")
+
+        path = urlsplit(Config.telegram_webhook_url).path or '/'
+        self.webhook = WebhookReceiver(self.application, path, Config.telegram_webhook_secret)
+
+        await self.application.initialize()
+        await self.application.start()
+        await self.webhook.start(Config.telegram_webhook_host, Config.telegram_webhook_port)
+        await self.application.bot.set_webhook(
+            Config.telegram_webhook_url,
+            secret_token=Config.telegram_webhook_secret,
+            allowed_updates=Update.ALL_TYPES
+        )
+        logger.info('Webhook registered for %s', Config.telegram_webhook_url)
+
+    async def stop_webhook(self) -> None:
+        if self.webhook is not None:
+            await self.webhook.stop()
+            self.webhook = None
+
+        if self.application.running:
+            await self.application.stop()
+        await self.application.shutdown()
+        logger.debug('Webhook receiver stopped')
+
+    def __run_webhook(self, loop: asyncio.AbstractEventLoop) -> None:
+        logger.info('Starting bot webhook receiver')
+        for sig in (signal.SIGINT, signal.SIGTERM, signal.SIGABRT):
+            loop.add_signal_handler(sig, self.stop)
+
+        try:
+            loop.run_until_complete(self.start_webhook())
+            loop.run_forever()
+        finally:
+            loop.run_until_complete(self.stop_webhook())
+        logger.debug('Webhook loop exited')
+
     def stop(self) -> None:
         logger.info('Stopping bot')
         if self.loop is None:
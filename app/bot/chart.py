@@ -0,0 +1,149 @@
+import asyncio
+import importlib.util
+import io
+import logging
+import math
+import re
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+from app.status import Status
+from app.status.history import Bucket
+from app.utils import SingletonMeta
+
+logger = logging.getLogger(__name__)
+
+HAVE_MATPLOTLIB = importlib.util.find_spec("matplotlib") is not None
+
+SPARK_CHARS = "▁▂▃▄▅▆▇█"
+RANGE_UNITS = {"m": 60, "h": 3600, "d": 86400}
+
+
+@dataclass(frozen=True)
+class Chart:
+    caption: str
+    image: Optional[bytes] = None
+    text: Optional[str] = None
+
+
+def parse_range(text: str) -> Optional[int]:
+    match = re.fullmatch(r"(\d+)([mhd])", text.strip().lower())
+    if match is None:
+        return None
+    seconds = int(match.group(1)) * RANGE_UNITS[match.group(2)]
+    return seconds if seconds > 0 else None
+
+
+def _spark_line(values: list[Optional[float]], low: float, high: float) -> str:
+    line = []
+    for value in values:
+        if value is None:
+            line.append(" ")
+        elif high == low:
+            line.append(SPARK_CHARS[len(SPARK_CHARS) // 2])
+        else:
+            level = round((value - low) / (high - low) * (len(SPARK_CHARS) - 1))
+            line.append(SPARK_CHARS[level])
+    return "".join(line)
+
+
+def render_sparkline(buckets: list[Bucket]) -> str:
+    present = [bucket for bucket in buckets if bucket is not None]
+    if not present:
+        return "no samples"
+
+    low = min(bucket[0] for bucket in present)
+    high = max(bucket[1] for bucket in present)
+    legend = f"{low:g} … {high:g}"
+
+    # A second row only when a bucket spans more than one level, e.g. a short outage inside it
+    level = (high - low) / (len(SPARK_CHARS) - 1)
+    if all(bucket[1] - bucket[0] <= level for bucket in present):
+        return f"{_spark_line([(b[0] + b[1]) / 2 if b else None for b in buckets], low, high)}\n{legend}"
+
+    maxs = _spark_line([bucket[1] if bucket else None for bucket in buckets], low, high)
+    mins = _spark_line([bucket[0] if bucket else None for bucket in buckets], low, high)
+    return f"max {maxs}\nmin {mins}\n{legend}"
+
+
+def render_image(title: str, start: float, end: float, buckets: list[Bucket]) -> bytes:
+    from matplotlib.dates import date2num
+    from matplotlib.figure import Figure
+
+    step = (end - start) / len(buckets)
+    times = date2num([datetime.fromtimestamp(start + (index + 0.5) * step) for index in range(len(buckets))])
+    lows = [bucket[0] if bucket else math.nan for bucket in buckets]
+    highs = [bucket[1] if bucket else math.nan for bucket in buckets]
+
+    figure = Figure(figsize=(8, 3), dpi=100)
+    axes = figure.subplots()
+    axes.fill_between(times, lows, highs, step='mid', alpha=0.4, linewidth=0)
+    axes.step(times, highs, where='mid', linewidth=1)
+    axes.xaxis_date()
+    axes.set_title(title)
+    axes.grid(True, alpha=0.3)
+    figure.autofmt_xdate()
+    figure.tight_layout()
+
+    buffer = io.BytesIO()
+    figure.savefig(buffer, format='png')
+    return buffer.getvalue()
+
+
+class ChartRenderer(metaclass=SingletonMeta):
+    """Renders history charts, cached by source, range and history version.
+
+    Concurrent requests for the same chart share one in-flight render.
+    """
+
+    def __init__(self, max_entries: int = 32, text_width: int = 40, image_width: int = 400):
+        self.max_entries = max_entries
+        self.text_width = text_width
+        self.image_width = image_width
+        self.cache: OrderedDict[tuple[str, int, int], asyncio.Future[Chart]] = OrderedDict()
+
+    def sources(self) -> list[str]:
+        return sorted(Status().history.sources)
+
+    def _render(self, source: str, range_text: str, seconds: int) -> 'asyncio.Future[Chart]':
+        history = Status().history
+        end = history.last_time(source) or 0.0
+        start = end - seconds
+        title = f"{source}, last {range_text} to {datetime.fromtimestamp(end):%d.%m %H:%M}"
+
+        loop = asyncio.get_running_loop()
+        if HAVE_MATPLOTLIB:
+            # Bucketing reads live history, so it stays on the loop; only drawing goes to a thread
+            buckets = history.downsample(source, start, end, self.image_width)
+            return loop.run_in_executor(None, lambda: Chart(title, image=render_image(title, start, end, buckets)))
+
+        future: asyncio.Future[Chart] = loop.create_future()
+        buckets = history.downsample(source, start, end, self.text_width)
+        future.set_result(Chart(title, text=render_sparkline(buckets)))
+        return future
+
+    async def chart(self, source: str, range_text: str) -> Chart:
+        seconds = parse_range(range_text)
+        if seconds is None:
+            raise ValueError(f"Invalid range {range_text}, use e.g. 30m, 6h or 2d")
+        if source not in Status().history.sources:
+            raise ValueError(f"Unknown source {source}, available: {', '.join(self.sources())}")
+
+        key = (source, seconds, Status().history.version(source))
+        future = self.cache.get(key)
+        if future is None:
+            logger.debug("Rendering chart %s", key)
+            future = self._render(source, range_text, seconds)
+            self.cache[key] = future
+            if len(self.cache) > self.max_entries:
+                self.cache.popitem(last=False)
+        else:
+            self.cache.move_to_end(key)
+
+        try:
+            return await asyncio.shield(future)
+        except Exception:
+            self.cache.pop(key, None)
+            raise
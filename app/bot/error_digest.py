@@ -0,0 +1,170 @@
+import asyncio
+import html
+import logging
+import os
+import time
+import traceback
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+from telegram import Bot as TelegramBot
+from telegram.constants import ParseMode
+
+from app.config import Config
+from app.utils import SingletonMeta
+
+logger = logging.getLogger(__name__)
+
+MAX_MESSAGE_SIZE = 4000
+
+
+@dataclass
+class ErrorEntry:
+    exc_type: str
+    location: str
+    message: str
+    details: Optional[str]
+    count: int = 0
+    total: int = 0
+    reported: bool = False
+
+
+def error_fingerprint(error: BaseException) -> tuple[str, str]:
+    """Exception type and the innermost traceback frame, without touching source files."""
+    location = "<no traceback>"
+    for frame, lineno in traceback.walk_tb(error.__traceback__):
+        location = f"{os.path.basename(frame.f_code.co_filename)}:{lineno} in {frame.f_code.co_name}"
+
+    return (type(error).__qualname__, location)
+
+
+def escape_limited(text: str, limit: int, keep_tail: bool = False) -> str:
+    """HTML-escape `text` to at most `limit` characters, cutting between entities rather than inside one."""
+    escaped = html.escape(text)
+    if len(escaped) <= limit:
+        return escaped
+
+    kept: list[str] = []
+    size = 1
+    for char in (reversed(text) if keep_tail else text):
+        part = html.escape(char)
+        if size + len(part) > limit:
+            break
+        kept.append(part)
+        size += len(part)
+
+    return "…" + "".join(reversed(kept)) if keep_tail else "".join(kept) + "…"
+
+
+class ErrorDigest(metaclass=SingletonMeta):
+    """Bounded table of error fingerprints, flushed to the developer chat at most once per interval."""
+
+    def __init__(self, max_entries: int = 64, max_text: int = 200, details_lines: int = 6):
+        self.interval = Config.error_digest_interval
+        self.max_entries = max_entries
+        self.max_text = max_text
+        self.details_lines = details_lines
+
+        self.entries: OrderedDict[tuple[str, str], ErrorEntry] = OrderedDict()
+        self.dropped = 0
+        self.__last_flush: Optional[float] = None
+        self.__flush_task: Optional[asyncio.Task] = None
+
+    def record(self, error: BaseException, context: str) -> ErrorEntry:
+        key = error_fingerprint(error)
+        entry = self.entries.get(key)
+        if entry is None:
+            # Full traceback is formatted only once per fingerprint
+            tb_lines = traceback.format_exception(type(error), error, error.__traceback__, limit=-self.details_lines)
+            details = f"{context[:self.max_text]}\n{''.join(tb_lines)[-MAX_MESSAGE_SIZE // 4:]}"
+            entry = ErrorEntry(key[0], key[1], str(error)[:self.max_text], details)
+            self.entries[key] = entry
+
+            if len(self.entries) > self.max_entries:
+                _, evicted = self.entries.popitem(last=False)
+                self.dropped += evicted.count
+        else:
+            self.entries.move_to_end(key)
+
+        entry.count += 1
+        entry.total += 1
+        return entry
+
+    def pending(self) -> bool:
+        return self.dropped > 0 or any(entry.count > 0 for entry in self.entries.values())
+
+    def format_digest(self) -> tuple[str, list[ErrorEntry]]:
+        """Digest text and the entries it shows; entries that did not fit stay pending for the next one."""
+        active = sorted((entry for entry in self.entries.values() if entry.count > 0), key=lambda e: -e.count)
+        occurrences = sum(entry.count for entry in active) + self.dropped
+
+        lines = [f"<b>{occurrences} error(s) since the last report</b>"]
+        size = len(lines[0])
+        included: list[ErrorEntry] = []
+        for index, entry in enumerate(active):
+            # Escaping can grow text several times (' becomes &#x27;), so limits apply to the escaped form
+            block = (f"<pre>{entry.count}× (total {entry.total}) {html.escape(entry.exc_type)} "
+                     f"at {html.escape(entry.location)}\n{escape_limited(entry.message, 2 * self.max_text)}</pre>")
+            if not entry.reported and entry.details is not None:
+                details = escape_limited(entry.details, MAX_MESSAGE_SIZE // 4, keep_tail=True)
+                block += f"\n<pre>{details}</pre>"
+
+            if size + len(block) > MAX_MESSAGE_SIZE - 100:
+                lines.append(f"… and {len(active) - index} more fingerprint(s) in the next report")
+                break
+            lines.append(block)
+            size += len(block)
+            included.append(entry)
+
+        if self.dropped > 0:
+            lines.append(f"{self.dropped} occurrence(s) of evicted fingerprints")
+
+        return ("\n".join(lines), included)
+
+    def reset(self, sent: list[tuple[ErrorEntry, int]], sent_dropped: int) -> None:
+        """Forget what a delivered digest covered; errors recorded while it was being sent stay pending."""
+        for entry, count in sent:
+            entry.count = max(entry.count - count, 0)
+            entry.reported = True
+            entry.details = None
+        self.dropped = max(self.dropped - sent_dropped, 0)
+
+    async def flush(self, bot: TelegramBot) -> None:
+        self.__last_flush = time.monotonic()
+        if not self.pending():
+            return
+
+        message, included = self.format_digest()
+        sent = [(entry, entry.count) for entry in included]
+        sent_dropped = self.dropped
+        try:
+            await bot.send_message(chat_id=Config.developer_chat_id, text=message, parse_mode=ParseMode.HTML)
+        except Exception as e:
+            # Keep the counts so the digest goes out with the next interval instead of being lost
+            logger.error("Error sending error digest, retrying in %ss: %s", self.interval, e)
+            if self.__flush_task is None:
+                self.__flush_task = asyncio.get_running_loop().create_task(self.__delayed_flush(bot, self.interval))
+            return
+
+        self.reset(sent, sent_dropped)
+        if self.pending() and self.__flush_task is None:
+            # Fingerprints that did not fit go out after the next interval even if no new errors arrive
+            self.__flush_task = asyncio.get_running_loop().create_task(self.__delayed_flush(bot, self.interval))
+
+    async def __delayed_flush(self, bot: TelegramBot, delay: float) -> None:
+        await asyncio.sleep(delay)
+        self.__flush_task = None
+        await self.flush(bot)
+
+    async def schedule(self, bot: TelegramBot) -> None:
+        """Flush now if the interval has passed, otherwise make sure one delayed flush is pending."""
+        if self.__flush_task is not None:
+            return
+
+        now = time.monotonic()
+        if self.__last_flush is None or now - self.__last_flush >= self.interval:
+            await self.flush(bot)
+        else:
+            delay = self.__last_flush + self.interval - now
+            self.__flush_task = asyncio.get_running_loop().create_task(self.__delayed_flush(bot, delay))
@@ -1,47 +1,40 @@
-import html
-import json
 import logging
-import traceback
 
 from telegram import Update
 from telegram.constants import ParseMode
 from telegram.ext import ContextTypes
+from telegram.helpers import escape_markdown
 
-from app.config import Config
 from app.status import Status
 
+from .chart import ChartRenderer, parse_range
+from .error_digest import ErrorDigest
+
 logger = logging.getLogger(__name__)
 
 
+def _describe_update(update: object) -> str:
+    if not isinstance(update, Update):
+        return f"update = {update!r}"[:200]
+
+    chat_id = update.effective_chat.id if update.effective_chat is not None else None
+    text = update.effective_message.text if update.effective_message is not None else None
+    return f"update {update.update_id} chat {chat_id}: {text!r}"
+
+
 async def error_handler(update: object, context: ContextTypes.DEFAULT_TYPE) -> None:
-    """Log the error and send a telegram message to notify the developer."""
+    """Log the error and fold it into the rate-limited developer digest."""
     # Log the error before we do anything else, so we can see it even if something breaks.
     logger.error(msg="Exception while handling an update:",
                  exc_info=context.error)
 
-    # traceback.format_exception returns the usual python message about an exception, but as a
-    # list of strings rather than a single string, so we have to join them together.
-    tb_msg = context.error.__traceback__ if context.error is not None else None
-    tb_list = traceback.format_exception(None, context.error, tb_msg)
-    tb_string = "".join(tb_list)
-
-    # Build the message with some markup and additional information about what happened.
-    # You might need to add some logic to deal with messages longer than the 4096 character limit.
-    update_str = update.to_dict() if isinstance(update, Update) else str(update)
-    message = (
-        f"An exception was raised while handling an update\n"
-        f"<pre>update = {html.escape(json.dumps(update_str, indent=2, ensure_ascii=False))}"
-        "</pre>\n\n"
-        f"<pre>context.chat_data = {html.escape(str(context.chat_data))}</pre>\n\n"
-        f"<pre>context.user_data = {html.escape(str(context.user_data))}</pre>\n\n"
-        f"<pre>{html.escape(tb_string)}</pre>"
-    )
-
-    # Finally, send the message
-    # max message size 4096
-    await context.bot.send_message(
-        chat_id=Config.developer_chat_id, text=message[:4000], parse_mode=ParseMode.HTML
-    )
+    if context.error is None:
+        return
+
+    # Errors are counted per fingerprint and reported at most once per digest interval,
+    # so an error storm does not flood the developer chat or hit Telegram limits.
+    ErrorDigest().record(context.error, _describe_update(update))
+    await ErrorDigest().schedule(context.bot)
 
 
 async def start_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -72,3 +65,42 @@ async def status_cmd(update: Update, _context: ContextTypes.DEFAULT_TYPE) -> Non
         return
 
     await update.message.reply_text(Status().generate_status_msg(["bot_status_cmd"]), parse_mode=ParseMode.MARKDOWN_V2)
+
+
+async def energy_cmd(update: Update, _context: ContextTypes.DEFAULT_TYPE) -> None:
+    logger.debug("bot_energy_cmd %s", update)
+
+    if update.message is None:
+        logger.error("bot_energy_cmd with message None")
+        return
+
+    await update.message.reply_text(Status().generate_energy_msg(), parse_mode=ParseMode.MARKDOWN_V2)
+
+
+async def chart_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    logger.debug("bot_chart_cmd %s", update)
+
+    if update.message is None:
+        logger.error("bot_chart_cmd with message None")
+        return
+
+    args = list(context.args or [])
+    range_text = args.pop() if args and parse_range(args[-1]) is not None else "6h"
+    source = " ".join(args)
+    if not source:
+        sources = ", ".join(ChartRenderer().sources()) or "none yet"
+        await update.message.reply_text(f"Usage: /chart <source> [30m|6h|2d]\nSources: {sources}")
+        return
+
+    try:
+        chart = await ChartRenderer().chart(source, range_text)
+    except ValueError as e:
+        await update.message.reply_text(str(e))
+        return
+
+    if chart.image is not None:
+        await update.message.reply_photo(chart.image, caption=chart.caption)
+    else:
+        text = chart.text or ""
+        await update.message.reply_text(f"{escape_markdown(chart.caption, version=2)}\n```\n{text}\n```",
+                                        parse_mode=ParseMode.MARKDOWN_V2)
@@ -0,0 +1,54 @@
+import hmac
+import json
+import logging
+from typing import Optional
+
+from telegram import Update
+from telegram.ext import Application
+
+from app.utils import HTTPRequest, HTTPResponse, HTTPServer
+
+logger = logging.getLogger(__name__)
+
+SECRET_TOKEN_HEADER = 'x-telegram-bot-api-secret-token'
+
+
+class WebhookReceiver:
+    """Accepts Telegram webhook POSTs and feeds them into the application's update queue."""
+
+    def __init__(self, application: Application, path: str, secret_token: str):
+        self.application = application
+        self.path = path
+        self.secret_token = secret_token
+        self.__server = HTTPServer(self.handle)
+
+    @property
+    def port(self) -> Optional[int]:
+        return self.__server.port
+
+    async def handle(self, request: HTTPRequest) -> HTTPResponse:
+        if request.path != self.path:
+            return HTTPResponse(404)
+        if request.method != 'POST':
+            return HTTPResponse(405)
+
+        if not hmac.compare_digest(request.headers.get(SECRET_TOKEN_HEADER, ''), self.secret_token):
+            logger.warning("Rejected webhook request with invalid secret token")
+            return HTTPResponse(403)
+
+        try:
+            update = Update.de_json(json.loads(request.body), self.application.bot)
+        except Exception as e:
+            # Bodies of the wrong shape fail anywhere inside de_json (KeyError, TypeError, ...); a 500 would
+            # only make Telegram retry the same update
+            logger.warning("Rejected malformed webhook update: %s", e)
+            return HTTPResponse(400)
+
+        await self.application.update_queue.put(update)
+        return HTTPResponse(200)
+
+    async def start(self, host: str, port: int) -> None:
+        await self.__server.start(host, port)
+
+    async def stop(self) -> None:
+        await self.__server.stop()
@@ -1,5 +1,6 @@
 import logging
 import os
+import socket
 from typing import Optional
 
 import dotenv
@@ -14,8 +15,24 @@ class Config:
     log_file: str
     log_level: str
     telegram_bot_token: str
+    telegram_base_url: str
+    telegram_pool_size: int
+    telegram_webhook_url: str
+    telegram_webhook_secret: str
+    telegram_webhook_host: str
+    telegram_webhook_port: int
     developer_chat_id: int
     notify_chat_ids: list[int]
+    error_digest_interval: float
+    status_api_host: str
+    status_api_port: int
+    status_api_socket: str
+    site_mode: str
+    site_name: str
+    aggregator_host: str
+    aggregator_bind: str
+    aggregator_port: int
+    aggregator_token: str
 
     @staticmethod
     def __load_dotenv():
@@ -32,9 +49,28 @@ class Config:
         Config.log_directory = getenv('LOG_DIR')
         Config.log_file = getenv('LOG_FILE')
         Config.log_level = getenv('LOG_LEVEL', 'DEBUG')
-        Config.telegram_bot_token = getenv('TELEGRAM_BOT_TOKEN')
-        Config.developer_chat_id = getenv_typed('DEVELOPER_CHAT_ID', int)
-        Config.notify_chat_ids = list(map(int, getenv('NOTIFY_CHAT_IDS').split(',')))
+        Config.site_mode = getenv('SITE_MODE', 'standalone').lower()
+        # A headless site agent never talks to Telegram, so the bot settings are optional there
+        headless = Config.site_mode == 'agent'
+        Config.telegram_bot_token = getenv('TELEGRAM_BOT_TOKEN', '' if headless else None)
+        Config.telegram_base_url = getenv('TELEGRAM_BASE_URL', 'https://api.telegram.org/bot')
+        Config.telegram_pool_size = getenv_typed('TELEGRAM_POOL_SIZE', int, 8)
+        Config.telegram_webhook_url = getenv('TELEGRAM_WEBHOOK_URL', '')
+        Config.telegram_webhook_secret = getenv('TELEGRAM_WEBHOOK_SECRET', '')
+        Config.telegram_webhook_host = getenv('TELEGRAM_WEBHOOK_HOST', '127.0.0.1')
+        Config.telegram_webhook_port = getenv_typed('TELEGRAM_WEBHOOK_PORT', int, 8443)
+        Config.developer_chat_id = getenv_typed('DEVELOPER_CHAT_ID', int, 0 if headless else None)
+        notify_chat_ids = getenv('NOTIFY_CHAT_IDS', '' if headless else None)
+        Config.notify_chat_ids = [int(chat_id) for chat_id in notify_chat_ids.split(',') if chat_id]
+        Config.error_digest_interval = getenv_typed('ERROR_DIGEST_INTERVAL', float, 300.0)
+        Config.status_api_host = getenv('STATUS_API_HOST', '127.0.0.1')
+        Config.status_api_port = getenv_typed('STATUS_API_PORT', int, 0)
+        Config.status_api_socket = getenv('STATUS_API_SOCKET', '')
+        Config.site_name = getenv('SITE_NAME', socket.gethostname())
+        Config.aggregator_host = getenv('AGGREGATOR_HOST', '127.0.0.1')
+        Config.aggregator_bind = getenv('AGGREGATOR_BIND', '127.0.0.1')
+        Config.aggregator_port = getenv_typed('AGGREGATOR_PORT', int, 7272)
+        Config.aggregator_token = getenv('AGGREGATOR_TOKEN', '')
 
         if not os.path.exists(Config.log_directory):
             os.mkdir(Config.log_directory)
@@ -0,0 +1,5 @@
+from .agent import SiteAgent
+from .aggregator import SiteAggregator, SiteState
+from .protocol import Delta
+
+__all__ = ['SiteAgent', 'SiteAggregator', 'SiteState', 'Delta']
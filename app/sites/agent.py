@@ -0,0 +1,170 @@
+import asyncio
+import logging
+import uuid
+from collections import deque
+from typing import Optional
+
+from app.config import Config
+from app.status import Status
+from app.utils import SingletonMeta
+
+from .protocol import MAX_LINE, Delta, decode, encode
+
+logger = logging.getLogger(__name__)
+
+
+class SiteAgent(metaclass=SingletonMeta):
+    """Streams this site's `Status` changes to the aggregator as batched, sequenced deltas.
+
+    Deltas stay buffered until acknowledged and are resent after a reconnect. If the
+    aggregator has lost track of this site (restart, or buffer overflow here), the buffer
+    is replaced by a full snapshot carrying the triggers of the deltas it replaces.
+    """
+
+    def __init__(self, batch_interval: float = 1.0, max_buffer: int = 1000, reconnect_delay: float = 5.0):
+        self.batch_interval = batch_interval
+        self.max_buffer = max_buffer
+        self.reconnect_delay = reconnect_delay
+
+        self.boot_id = uuid.uuid4().hex
+        self.seq = 0
+        self.buffer: deque[Delta] = deque()
+
+        self.__sent_rows: dict[tuple[str, str], str] = {}
+        self.__pending_rows: dict[tuple[str, str], str] = {}
+        self.__pending_triggered: list[str] = []
+        # Highest sequence number written to the current connection
+        self.__sent_seq = 0
+        self.__writer: Optional[asyncio.StreamWriter] = None
+
+    def start(self) -> None:
+        logger.info("Starting site agent %s", Config.site_name)
+        self._queue_full_snapshot()
+        Status().add_change_listener(self._on_change)
+
+        loop = asyncio.get_event_loop()
+        loop.create_task(self.__flush_loop())
+        loop.create_task(self.__connection_loop())
+
+    async def on_update(self, triggered_by: list[str]) -> None:
+        self.__pending_triggered.extend(triggered_by)
+
+    def _on_change(self) -> None:
+        for group, name, value in Status().status_rows():
+            if self.__sent_rows.get((group, name)) != value:
+                self.__pending_rows[(group, name)] = value
+
+    def _enqueue(self, delta: Delta) -> None:
+        self.buffer.append(delta)
+        if len(self.buffer) > self.max_buffer:
+            logger.warning("Site agent buffer overflow, replacing %s deltas with a snapshot", len(self.buffer))
+            self._replace_with_snapshot()
+
+    def _queue_full_snapshot(self, triggered_by: Optional[list[str]] = None) -> None:
+        self.__pending_rows.clear()
+        rows = Status().status_rows()
+        self.__sent_rows = {(group, name): value for group, name, value in rows}
+
+        self.seq += 1
+        self.buffer.append(Delta(self.seq, rows, triggered_by or [],
+                                 [str(name) for name in Status().statuses_fail], True))
+
+    def _replace_with_snapshot(self) -> None:
+        # Notifications of the dropped deltas and of changes not yet batched go out with the snapshot
+        triggered_by = [name for delta in self.buffer for name in delta.triggered_by] + self.__pending_triggered
+        self.__pending_triggered = []
+        self.buffer.clear()
+        self._queue_full_snapshot(list(dict.fromkeys(triggered_by)))
+
+    def _take_delta(self) -> Optional[Delta]:
+        if not self.__pending_rows and not self.__pending_triggered:
+            return None
+
+        rows = [(group, name, value) for (group, name), value in self.__pending_rows.items()]
+        self.__sent_rows.update(self.__pending_rows)
+        self.__pending_rows = {}
+
+        self.seq += 1
+        delta = Delta(self.seq, rows, self.__pending_triggered)
+        self.__pending_triggered = []
+        return delta
+
+    def _acknowledge(self, seq: int) -> None:
+        while self.buffer and self.buffer[0].seq <= seq:
+            self.buffer.popleft()
+
+        # Aggregator is behind the oldest delta we still hold, only a snapshot can resync it
+        oldest = self.buffer[0].seq if self.buffer else self.seq + 1
+        if seq < oldest - 1:
+            logger.info("Aggregator acknowledged %s of %s, resending snapshot", seq, self.seq)
+            self._replace_with_snapshot()
+
+    async def __send_unsent(self) -> None:
+        if self.__writer is None:
+            return
+
+        deltas: list[Delta] = []
+        for delta in reversed(self.buffer):
+            if delta.seq <= self.__sent_seq:
+                break
+            deltas.append(delta)
+        if not deltas:
+            return
+
+        self.__sent_seq = deltas[0].seq
+        self.__writer.write(encode({"t": "batch", "d": [delta.to_dict() for delta in reversed(deltas)]}))
+        await self.__writer.drain()
+
+    async def __flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.batch_interval)
+            delta = self._take_delta()
+            if delta is not None:
+                self._enqueue(delta)
+
+            try:
+                await self.__send_unsent()
+            except (ConnectionError, OSError) as err:
+                logger.warning("Site agent send failed: %s", err)
+
+    async def __session(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        writer.write(encode({"t": "hello", "site": Config.site_name, "boot": self.boot_id,
+                             "token": Config.aggregator_token}))
+        await writer.drain()
+
+        first = True
+        while True:
+            line = await reader.readline()
+            if not line:
+                raise ConnectionError("Aggregator closed the connection")
+
+            message = decode(line)
+            if message["t"] != "ack":
+                continue
+
+            seq = int(message["s"])
+            self._acknowledge(seq)
+            if first:
+                # Everything still unacknowledged after the handshake is resent in one batch
+                first = False
+                self.__writer = writer
+                self.__sent_seq = seq
+            # A snapshot queued by the acknowledgement goes out right away
+            await self.__send_unsent()
+
+    async def __connection_loop(self) -> None:
+        while True:
+            writer = None
+            try:
+                reader, writer = await asyncio.open_connection(
+                    Config.aggregator_host, Config.aggregator_port, limit=MAX_LINE)
+                logger.info("Site agent connected to %s:%s", Config.aggregator_host, Config.aggregator_port)
+                await self.__session(reader, writer)
+            except (ConnectionError, OSError, ValueError, KeyError, TypeError) as err:
+                logger.warning("Site agent connection lost: %s", err)
+            finally:
+                self.__writer = None
+                if writer is not None:
+                    writer.close()
+
+            await asyncio.sleep(self.reconnect_delay)
@@ -0,0 +1,135 @@
+import asyncio
+import hmac
+import logging
+from dataclasses import dataclass, field
+from typing import Optional
+
+from app.config import Config
+from app.status import Status
+from app.utils import SingletonMeta
+
+from .protocol import MAX_LINE, Delta, decode, encode
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SiteState:
+    name: str
+    boot: str = ""
+    last_seq: int = 0
+    rows: dict[tuple[str, str], str] = field(default_factory=dict)
+    failed: list[str] = field(default_factory=list)
+    connections: int = 0
+
+    def apply(self, delta: Delta) -> bool:
+        if delta.seq <= self.last_seq or (delta.seq != self.last_seq + 1 and not delta.full):
+            return False
+
+        if delta.full:
+            self.rows = {}
+        for group, name, value in delta.rows:
+            self.rows[(group, name)] = value
+        if delta.failed is not None:
+            self.failed = delta.failed
+
+        self.last_seq = delta.seq
+        return True
+
+
+class SiteAggregator(metaclass=SingletonMeta):
+    """Receives deltas from site agents and merges them into the local `Status` view and notifications."""
+
+    def __init__(self) -> None:
+        self.sites: dict[str, SiteState] = {}
+        self.__server: Optional[asyncio.Server] = None
+
+    def start_serving(self) -> None:
+        if not Config.aggregator_token:
+            raise ValueError("Aggregator mode requires AGGREGATOR_TOKEN")
+
+        # AGGREGATOR_BIND is the listen address here, AGGREGATOR_HOST is where agents connect to
+        logger.info("Starting site aggregator")
+        Status().add_section_provider(self.text_sections)
+        loop = asyncio.get_event_loop()
+        loop.create_task(self.start(Config.aggregator_bind, Config.aggregator_port))
+
+    async def start(self, host: str, port: int) -> None:
+        self.__server = await asyncio.start_server(self.__serve, host, port, limit=MAX_LINE)
+        logger.info("Site aggregator listening on %s:%s", host, port)
+
+    async def stop(self) -> None:
+        if self.__server is not None:
+            self.__server.close()
+            await self.__server.wait_closed()
+            self.__server = None
+
+    def text_sections(self) -> list[tuple[str, list[tuple[str, str]]]]:
+        sections: list[tuple[str, list[tuple[str, str]]]] = []
+        for site in sorted(self.sites.values(), key=lambda s: s.name):
+            groups: dict[str, list[tuple[str, str]]] = {}
+            for (group, name), value in site.rows.items():
+                groups.setdefault(group, []).append((name, value))
+
+            suffix = "" if site.connections > 0 else " (offline)"
+            for group, rows in groups.items():
+                sections.append((f"{site.name}/{group}{suffix}", rows))
+            if site.failed:
+                sections.append((f"{site.name} failed statuses", [(name, "❌") for name in site.failed]))
+        return sections
+
+    async def _notify(self, site: SiteState, triggered_by: list[str]) -> None:
+        try:
+            await Status().on_update([f"{site.name}/{name}" for name in triggered_by])
+        except Exception as err:
+            logger.error("Error during on_update() for site %s: %s", site.name, err)
+
+    async def __handshake(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> Optional[SiteState]:
+        hello = decode(await reader.readline())
+        if hello["t"] != "hello" or not hmac.compare_digest(str(hello.get("token", "")), Config.aggregator_token):
+            logger.warning("Rejected site agent handshake from %s", writer.get_extra_info('peername'))
+            return None
+
+        name = str(hello["site"])
+        site = self.sites.setdefault(name, SiteState(name))
+        if site.boot != hello.get("boot"):
+            # A restarted agent numbers its deltas from scratch
+            site.boot = str(hello.get("boot"))
+            site.last_seq = 0
+
+        site.connections += 1
+        writer.write(encode({"t": "ack", "s": site.last_seq}))
+        await writer.drain()
+        logger.info("Site %s connected, last sequence %s", name, site.last_seq)
+        return site
+
+    async def __serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        site = None
+        try:
+            site = await self.__handshake(reader, writer)
+            while site is not None:
+                line = await reader.readline()
+                if not line:
+                    break
+
+                message = decode(line)
+                if message["t"] != "batch":
+                    continue
+
+                triggered_by = []
+                for delta in map(Delta.from_dict, message.get("d", [])):
+                    if site.apply(delta):
+                        triggered_by.extend(delta.triggered_by)
+
+                writer.write(encode({"t": "ack", "s": site.last_seq}))
+                await writer.drain()
+
+                if triggered_by:
+                    await self._notify(site, triggered_by)
+        except (ConnectionError, ValueError, KeyError) as err:
+            logger.warning("Site agent connection error: %s", err)
+        finally:
+            if site is not None:
+                site.connections -= 1
+                logger.info("Site %s disconnected", site.name)
+            writer.close()
@@ -0,0 +1,49 @@
+import json
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+# Newline-delimited JSON messages between an agent and the aggregator:
+#   agent -> aggregator: {"t": "hello", "site", "boot", "token"} then {"t": "batch", "d": [delta, ...]}
+#   aggregator -> agent: {"t": "ack", "s": last applied sequence number}
+
+MAX_LINE = 1 << 20
+
+
+@dataclass
+class Delta:
+    seq: int
+    rows: list[tuple[str, str, str]]
+    triggered_by: list[str] = field(default_factory=list)
+    failed: Optional[list[str]] = None
+    full: bool = False
+
+    def to_dict(self) -> dict[str, Any]:
+        data: dict[str, Any] = {"s": self.seq, "r": self.rows}
+        if self.triggered_by:
+            data["t"] = self.triggered_by
+        if self.failed is not None:
+            data["f"] = self.failed
+        if self.full:
+            data["full"] = 1
+        return data
+
+    @staticmethod
+    def from_dict(data: dict[str, Any]) -> 'Delta':
+        return Delta(
+            int(data["s"]),
+            [(str(group), str(name), str(value)) for group, name, value in data.get("r", [])],
+            [str(name) for name in data.get("t", [])],
+            data.get("f"),
+            bool(data.get("full", False))
+        )
+
+
+def encode(message: dict[str, Any]) -> bytes:
+    return json.dumps(message, ensure_ascii=False, separators=(',', ':')).encode() + b"\n"
+
+
+def decode(line: bytes) -> dict[str, Any]:
+    message = json.loads(line)
+    if not isinstance(message, dict) or "t" not in message:
+        raise ValueError("Malformed site message")
+    return message
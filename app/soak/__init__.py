@@ -0,0 +1,7 @@
+from .fake_telegram import FakeTelegramAPI
+from .harness import (LatencyHistogram, Phase, ReportCallback, SoakHarness,
+                      SoakReport)
+from .sources import SimulatedGPIO, SimulatedJSONFile
+
+__all__ = ['SoakHarness', 'SoakReport', 'ReportCallback', 'Phase', 'LatencyHistogram', 'FakeTelegramAPI',
+           'SimulatedGPIO', 'SimulatedJSONFile']
@@ -0,0 +1,115 @@
+import asyncio
+import json
+import logging
+import time
+from typing import Any, Callable, Optional
+from urllib.parse import parse_qsl
+
+import httpx
+
+from app.utils import HTTPRequest, HTTPResponse, HTTPServer
+
+logger = logging.getLogger(__name__)
+
+DeliveryCallback = Callable[[float, int, str], None]
+
+
+class FakeTelegramAPI:
+    """Local stand-in for the Telegram Bot API, answering just enough methods for `Bot`.
+
+    Every `sendMessage` is reported to `on_message` with the receive timestamp
+    (`time.perf_counter()`), the chat id and the message text.
+    """
+
+    def __init__(self, on_message: Optional[DeliveryCallback] = None, poll_timeout: float = 1.0):
+        self.on_message = on_message
+        self.poll_timeout = poll_timeout
+        self.calls: dict[str, int] = {}
+        self.updates: asyncio.Queue[dict[str, Any]] = asyncio.Queue()
+        self.webhook: dict[str, Any] = {}
+
+        self.__server = HTTPServer(self.__handle)
+        self.__message_id = 0
+        self.__update_id = 0
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.__server.port}/bot"
+
+    async def start(self, port: int = 0) -> None:
+        await self.__server.start('127.0.0.1', port)
+
+    async def stop(self) -> None:
+        await self.__server.stop()
+
+    def push_update(self, update: dict[str, Any]) -> None:
+        self.__update_id += 1
+        self.updates.put_nowait({"update_id": self.__update_id, **update})
+
+    async def deliver_webhook(self, update: dict[str, Any], secret_token: Optional[str] = None) -> int:
+        """POST an update to the registered webhook like Telegram does, returning the HTTP status."""
+        self.__update_id += 1
+        headers = {"X-Telegram-Bot-Api-Secret-Token": secret_token or self.webhook.get("secret_token", "")}
+        async with httpx.AsyncClient() as client:
+            response = await client.post(self.webhook["url"], json={"update_id": self.__update_id, **update},
+                                         headers=headers)
+        return response.status_code
+
+    def _parse_params(self, request: HTTPRequest) -> dict[str, Any]:
+        content_type = request.headers.get('content-type', '')
+        if content_type.startswith('application/json'):
+            return json.loads(request.body or b'{}')
+        if content_type.startswith('multipart/form-data'):
+            # File uploads (sendPhoto) are only counted, their fields are not needed
+            return {}
+
+        params: dict[str, Any] = {}
+        for key, value in parse_qsl(request.body.decode()):
+            try:
+                params[key] = json.loads(value)
+            except ValueError:
+                params[key] = value
+        return params
+
+    def _message(self, params: dict[str, Any]) -> dict[str, Any]:
+        self.__message_id += 1
+        return {
+            "message_id": self.__message_id,
+            "date": int(time.time()),
+            "chat": {"id": params.get("chat_id"), "type": "private"},
+            "text": params.get("text", ""),
+        }
+
+    async def _get_updates(self, params: dict[str, Any]) -> list[dict[str, Any]]:
+        timeout = min(float(params.get("timeout", 0)), self.poll_timeout)
+        try:
+            update = await asyncio.wait_for(self.updates.get(), timeout) if timeout > 0 else self.updates.get_nowait()
+        except (asyncio.TimeoutError, asyncio.QueueEmpty):
+            return []
+
+        result = [update]
+        while not self.updates.empty():
+            result.append(self.updates.get_nowait())
+        return result
+
+    async def __handle(self, request: HTTPRequest) -> HTTPResponse:
+        method = request.path.rsplit("/", 1)[-1]
+        self.calls[method] = self.calls.get(method, 0) + 1
+        params = self._parse_params(request)
+
+        result: Any = True
+        match method:
+            case "getMe":
+                result = {"id": 1, "is_bot": True, "first_name": "Soak", "username": "soak_bot"}
+            case "sendMessage":
+                result = self._message(params)
+                if self.on_message is not None:
+                    self.on_message(time.perf_counter(), int(params.get("chat_id", 0)), str(result["text"]))
+            case "getUpdates":
+                result = await self._get_updates(params)
+            case "setWebhook":
+                self.webhook = params
+            case "deleteWebhook":
+                self.webhook = {}
+
+        return HTTPResponse(200, json.dumps({"ok": True, "result": result}).encode())
@@ -0,0 +1,268 @@
+import ast
+import asyncio
+import json
+import logging
+import math
+import os
+import random
+import resource
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+import app.status.gpio_status as gpio_status
+import app.status.status as status_module
+from app.bot import Bot
+from app.config import Config
+from app.status import Status
+
+from .fake_telegram import FakeTelegramAPI
+from .sources import SimulatedGPIO, SimulatedJSONFile
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Phase:
+    duration: float
+    rate: float
+
+    @staticmethod
+    def parse(text: str) -> 'Phase':
+        duration, _, rate = text.partition(":")
+        return Phase(float(duration), float(rate or 1))
+
+
+class LatencyHistogram:
+    """Log-bucketed histogram, so week-long runs keep constant memory."""
+
+    def __init__(self, resolution: float = 0.02):
+        self.__log_base = math.log1p(resolution)
+        self.buckets: dict[int, int] = {}
+        self.count = 0
+        self.max = 0.0
+
+    def add(self, seconds: float) -> None:
+        index = math.ceil(math.log(max(seconds, 1e-6)) / self.__log_base)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.max = max(self.max, seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        if self.count == 0:
+            return None
+
+        rank = math.ceil(q / 100 * self.count)
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                return min(math.exp(index * self.__log_base), self.max)
+        return self.max
+
+
+@dataclass
+class SoakReport:
+    elapsed: float
+    edges: int
+    skipped: int
+    pending: int
+    messages: int
+    latency: LatencyHistogram
+    rss_kb: int
+    memory_growth: Optional[int] = None
+    calls: dict[str, int] = field(default_factory=dict)
+
+    def __str__(self) -> str:
+        def ms(value: Optional[float]) -> str:
+            return "-" if value is None else f"{value * 1000:.1f}ms"
+
+        lines = [
+            f"elapsed {self.elapsed:.0f}s: edges={self.edges} skipped={self.skipped} pending={self.pending} "
+            f"messages={self.messages} deliveries={self.latency.count}",
+            f"   latency p50={ms(self.latency.percentile(50))} p95={ms(self.latency.percentile(95))} "
+            f"p99={ms(self.latency.percentile(99))} max={ms(self.latency.max if self.latency.count else None)}",
+            f"   rss={self.rss_kb}KiB",
+        ]
+        if self.memory_growth is not None:
+            lines[-1] += f" traced_growth={self.memory_growth / 1024:.1f}KiB"
+        if self.calls:
+            lines.append(f"   api calls {self.calls}")
+        return "\n".join(lines)
+
+
+ReportCallback = Callable[[SoakReport], None]
+
+
+def current_rss_kb() -> int:
+    try:
+        with open("/proc/self/statm", "r") as file:
+            return int(file.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') // 1024
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+class SoakHarness:
+    """Runs the real `Status` + `Bot` stack against simulated inputs and a fake Bot API.
+
+    Each event flips one idle source and stamps the edge; the latency is taken when
+    the fake API receives a `sendMessage` naming that source in "Triggered by".
+    A source is not flipped again until its edge is delivered to every chat, so
+    every edge is observable and never cancelled by a second flip before sampling.
+    """
+
+    def __init__(self, work_dir: str, gpio_count: int = 4, json_field_count: int = 2,
+                 sync_interval: float = 0.05, chat_count: int = 1, trace_memory: bool = False, seed: int = 0):
+        self.work_dir = work_dir
+        self.gpio_count = gpio_count
+        self.json_field_count = json_field_count
+        self.sync_interval = sync_interval
+        self.chat_ids = list(range(1, chat_count + 1))
+        self.trace_memory = trace_memory
+        self.random = random.Random(seed)
+
+        self.gpio = SimulatedGPIO()
+        self.json_file = SimulatedJSONFile(
+            os.path.join(work_dir, "inverter.json"),
+            {f"field{i}": 0 for i in range(json_field_count)})
+        self.fake_api = FakeTelegramAPI(self._on_message)
+
+        self.pending: dict[str, float] = {}
+        self.latency = LatencyHistogram()
+        self.edges = 0
+        self.skipped = 0
+        self.messages = 0
+        self.__start = 0.0
+        self.__memory_baseline: Optional[int] = None
+
+    def _write_config(self) -> str:
+        statuses: list[dict] = [{
+            "type": "gpio",
+            "group": "Power",
+            "name": f"Input{i}",
+            "gpio_port": 100 + i,
+            "gpio_hight_mode": True,
+            "report_on_change": True,
+        } for i in range(self.gpio_count)]
+
+        if self.json_field_count > 0:
+            statuses.append({
+                "type": "json",
+                "group": "Status",
+                "file_path": self.json_file.file_path,
+                "fields": [{
+                    "name": f"Field{i}",
+                    "field": f"field{i}",
+                    "value": 0,
+                    "unit": "",
+                    "report_on_change": True,
+                    "report_on_change_value": 1,
+                } for i in range(self.json_field_count)],
+            })
+
+        config_path = os.path.join(self.work_dir, "config.json")
+        with open(config_path, "w") as file:
+            json.dump({"sync_interval": self.sync_interval, "statuses": statuses}, file)
+        return config_path
+
+    def _on_message(self, received: float, chat_id: int, text: str) -> None:
+        self.messages += 1
+
+        marker = "Triggered by: "
+        start = text.find(marker)
+        if start < 0:
+            return
+
+        end = text.find("\n", start)
+        triggered_by = ast.literal_eval(text[start + len(marker):end if end >= 0 else None])
+        for name in triggered_by:
+            edge = self.pending.get(name)
+            if edge is None:
+                continue
+            self.latency.add(received - edge)
+            if chat_id == self.chat_ids[-1]:
+                del self.pending[name]
+
+    def _fire_event(self) -> None:
+        sources = [f"Input{i}" for i in range(self.gpio_count)] + [f"Field{i}" for i in range(self.json_field_count)]
+        idle = [name for name in sources if name not in self.pending]
+        if not idle:
+            self.skipped += 1
+            return
+
+        name = self.random.choice(idle)
+        self.pending[name] = time.perf_counter()
+        self.edges += 1
+
+        if name.startswith("Input"):
+            self.gpio.toggle(100 + int(name[len("Input"):]))
+        else:
+            key = f"field{name[len('Field'):]}"
+            self.json_file.set(key, 10 - self.json_file.values[key])
+
+    def report(self) -> SoakReport:
+        growth = None
+        if self.trace_memory and self.__memory_baseline is not None:
+            growth = tracemalloc.get_traced_memory()[0] - self.__memory_baseline
+
+        return SoakReport(time.perf_counter() - self.__start, self.edges, self.skipped, len(self.pending),
+                          self.messages, self.latency, current_rss_kb(), growth, dict(self.fake_api.calls))
+
+    async def _drive(self, phases: list[Phase], warmup: float, report_interval: float,
+                     on_report: Optional[ReportCallback]) -> None:
+        next_report = time.perf_counter() + report_interval
+        for phase in phases:
+            logger.info("Soak phase: %ss at %s events/s", phase.duration, phase.rate)
+            phase_end = time.perf_counter() + phase.duration
+            while time.perf_counter() < phase_end:
+                if self.__memory_baseline is None and time.perf_counter() - self.__start >= warmup:
+                    self.__memory_baseline = tracemalloc.get_traced_memory()[0] if self.trace_memory else 0
+
+                self._fire_event()
+
+                if time.perf_counter() >= next_report:
+                    report = self.report()
+                    logger.info("Soak progress: %s", report)
+                    if on_report is not None:
+                        on_report(report)
+                    next_report += report_interval
+
+                delay = self.random.expovariate(phase.rate) if phase.rate > 0 else phase.duration
+                await asyncio.sleep(min(delay, max(phase_end - time.perf_counter(), 0)))
+
+    async def run(self, phases: list[Phase], warmup: float = 5, report_interval: float = 60,
+                  drain_timeout: float = 10, on_report: Optional[ReportCallback] = None) -> SoakReport:
+        if self.trace_memory:
+            tracemalloc.start()
+
+        await self.fake_api.start()
+
+        gpio_status.GPIO = self.gpio
+        status_module.GPIO = self.gpio
+        Config.telegram_bot_token = "0:soak"
+        Config.telegram_base_url = self.fake_api.base_url
+        Config.telegram_pool_size = 8
+        Config.developer_chat_id = self.chat_ids[0]
+        Config.notify_chat_ids = self.chat_ids
+
+        Status().init(self._write_config())
+        bot = Bot()
+        await bot.application.initialize()
+        Status().start_monitoring(bot.send_status_update)
+
+        self.__start = time.perf_counter()
+        try:
+            await self._drive(phases, warmup, report_interval, on_report)
+
+            drain_end = time.perf_counter() + drain_timeout
+            while self.pending and time.perf_counter() < drain_end:
+                await asyncio.sleep(self.sync_interval)
+        finally:
+            report = self.report()
+            await bot.application.shutdown()
+            await self.fake_api.stop()
+            if self.trace_memory:
+                tracemalloc.stop()
+
+        return report
@@ -0,0 +1,44 @@
+import json
+import os
+from typing import Any
+
+
+class SimulatedGPIO:
+    """Drop-in replacement for the parts of `RPi.GPIO` used by the status classes."""
+
+    BCM = 11
+    IN = 1
+
+    def __init__(self) -> None:
+        self.levels: dict[int, bool] = {}
+
+    def setmode(self, _mode: int) -> None:
+        pass
+
+    def setup(self, port: int, _direction: int) -> None:
+        self.levels.setdefault(port, False)
+
+    def input(self, port: int) -> bool:
+        return self.levels.get(port, False)
+
+    def toggle(self, port: int) -> None:
+        self.levels[port] = not self.levels.get(port, False)
+
+
+class SimulatedJSONFile:
+    """JSON file rewritten atomically on every change, as an inverter exporter would."""
+
+    def __init__(self, file_path: str, values: dict[str, Any]):
+        self.file_path = file_path
+        self.values = dict(values)
+        self.flush()
+
+    def set(self, name: str, value: Any) -> None:
+        self.values[name] = value
+        self.flush()
+
+    def flush(self) -> None:
+        tmp_path = f"{self.file_path}.tmp"
+        with open(tmp_path, "w") as file:
+            json.dump(self.values, file)
+        os.replace(tmp_path, self.file_path)
@@ -26,6 +26,12 @@ class ATSStatus:
             triggered_by.append(self.name)
         return (updated, triggered_by)
 
+    def activity(self) -> float:
+        return max(self.normal.activity(), self.standby.activity())
+
+    def numeric_samples(self) -> list[tuple[str, float]]:
+        return self.normal.numeric_samples() + self.standby.numeric_samples()
+
     def text_status(self) -> list[tuple[str, str]]:
         enabled = []
         if self.normal.fixed_status:
@@ -0,0 +1,157 @@
+import json
+import logging
+import math
+import os
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+Probe = Callable[[], Optional[float]]
+
+
+@dataclass
+class EnergyMeter:
+    name: str
+    probe: Probe
+    wh: float = 0.0
+    last_power: Optional[float] = None
+
+    def sample(self, dt: Optional[float]) -> None:
+        power = self.probe()
+        if power is None:
+            self.last_power = None
+            return
+
+        power = max(power, 0.0)
+        # Trapezoid between the previous and the current sample, skipped after a gap
+        if dt is not None and self.last_power is not None:
+            self.wh += (self.last_power + power) / 2 * dt / 3600
+        self.last_power = power
+
+    def text_status(self) -> tuple[str, str]:
+        return (self.name, f"{self.wh:.1f}Wh")
+
+
+@dataclass
+class BatteryEstimator:
+    name: str
+    probe: Probe
+    time_constant: float
+    percent: Optional[float] = None
+    # Smoothed discharge rate in percent per hour, negative while charging
+    rate: float = 0.0
+    last_time: Optional[float] = None
+
+    def sample(self, now: float, max_gap: float) -> None:
+        percent = self.probe()
+        if percent is None:
+            # Stale or missing reading: forget the last point rather than estimate from it
+            self.percent = None
+            self.last_time = None
+            return
+
+        if self.percent is not None and self.last_time is not None:
+            dt = now - self.last_time
+            if 0 < dt <= max_gap:
+                instant_rate = (self.percent - percent) / dt * 3600
+                alpha = 1 - math.exp(-dt / self.time_constant)
+                self.rate += alpha * (instant_rate - self.rate)
+
+        self.percent = percent
+        self.last_time = now
+
+    def runtime_hours(self) -> Optional[float]:
+        if self.percent is None or self.rate <= 0.01:
+            return None
+        return max(self.percent, 0.0) / self.rate
+
+    def text_status(self) -> tuple[str, str]:
+        if self.percent is None:
+            return (self.name, "no data")
+
+        runtime = self.runtime_hours()
+        if runtime is None:
+            return (self.name, "not discharging")
+
+        hours, minutes = divmod(int(runtime * 60), 60)
+        return (self.name, f"~{hours}h {minutes:02}m ({self.rate:.1f}%/h)")
+
+
+class EnergyAccountant:
+    """Integrates power readings into Wh counters and estimates battery runtime.
+
+    Every sample costs O(1) per meter; counters are persisted to `checkpoint_path`
+    at most once per `checkpoint_interval` seconds and restored on start.
+    """
+
+    meters: list[EnergyMeter]
+    battery: Optional[BatteryEstimator]
+
+    def __init__(self, meters: list[EnergyMeter], battery: Optional[BatteryEstimator],
+                 checkpoint_path: Optional[str], checkpoint_interval: float, max_gap: float):
+        self.meters = meters
+        self.battery = battery
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint_interval = checkpoint_interval
+        self.max_gap = max_gap
+
+        self.__last_sample: Optional[float] = None
+        self.__last_checkpoint: Optional[float] = None
+
+        self.restore()
+
+    def sample(self, now: float) -> None:
+        dt = None
+        if self.__last_sample is not None and 0 < now - self.__last_sample <= self.max_gap:
+            dt = now - self.__last_sample
+        self.__last_sample = now
+
+        for meter in self.meters:
+            meter.sample(dt)
+
+        if self.battery is not None:
+            self.battery.sample(now, self.max_gap)
+
+        if self.__last_checkpoint is None:
+            self.__last_checkpoint = now
+        elif now - self.__last_checkpoint >= self.checkpoint_interval:
+            self.checkpoint()
+            self.__last_checkpoint = now
+
+    def restore(self) -> None:
+        if self.checkpoint_path is None or not os.path.exists(self.checkpoint_path):
+            return
+
+        try:
+            with open(self.checkpoint_path, "r") as file:
+                data = json.load(file)
+        except Exception as e:
+            logger.error("Error reading energy checkpoint %s: %s", self.checkpoint_path, e)
+            return
+
+        counters = data.get("wh", {})
+        for meter in self.meters:
+            meter.wh = float(counters.get(meter.name, 0.0))
+        logger.info("Restored energy counters from %s", self.checkpoint_path)
+
+    def checkpoint(self) -> None:
+        if self.checkpoint_path is None:
+            return
+
+        tmp_path = f"{self.checkpoint_path}.tmp"
+        try:
+            with open(tmp_path, "w") as file:
+                json.dump({"wh": {meter.name: meter.wh for meter in self.meters}}, file)
+            os.replace(tmp_path, self.checkpoint_path)
+        except Exception as e:
+            logger.error("Error writing energy checkpoint %s: %s", self.checkpoint_path, e)
+            return
+
+        logger.debug("Energy counters saved to %s", self.checkpoint_path)
+
+    def text_status(self) -> list[tuple[str, str]]:
+        status = [meter.text_status() for meter in self.meters]
+        if self.battery is not None:
+            status.append(self.battery.text_status())
+        return status
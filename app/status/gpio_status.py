@@ -25,6 +25,13 @@ class GPIOStatus:
             return (updated, [self.name])
         return (updated, [])
 
+    def activity(self) -> float:
+        # Edges on a digital input cannot be anticipated, keep it at the fastest rate
+        return 1.0
+
+    def numeric_samples(self) -> list[tuple[str, float]]:
+        return [(self.name, 1.0 if self.fixed_status else 0.0)]
+
     def text_status(self) -> list[tuple[str, str]]:
         return [(self.name, '✅' if self.fixed_status else '❌')]
 
@@ -0,0 +1,74 @@
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from typing import Optional
+
+Bucket = Optional[tuple[float, float]]
+
+
+@dataclass
+class SourceHistory:
+    times: list[float] = field(default_factory=list)
+    values: list[float] = field(default_factory=list)
+    version: int = 0
+
+
+class SampleHistory:
+    """Recent numeric samples per source, stored on change plus a heartbeat.
+
+    Samples are treated as a step signal: a value holds until the next sample.
+    """
+
+    def __init__(self, capacity: int = 10000, heartbeat: float = 60):
+        self.capacity = capacity
+        self.heartbeat = heartbeat
+        self.sources: dict[str, SourceHistory] = {}
+
+    def record(self, name: str, timestamp: float, value: float) -> None:
+        source = self.sources.setdefault(name, SourceHistory())
+        if source.values and source.values[-1] == value and timestamp - source.times[-1] < self.heartbeat:
+            return
+
+        source.times.append(timestamp)
+        source.values.append(value)
+        source.version += 1
+
+        # Trim in chunks so appends stay amortised O(1)
+        if len(source.times) > 2 * self.capacity:
+            del source.times[:-self.capacity]
+            del source.values[:-self.capacity]
+
+    def version(self, name: str) -> int:
+        source = self.sources.get(name)
+        return source.version if source is not None else 0
+
+    def last_time(self, name: str) -> Optional[float]:
+        source = self.sources.get(name)
+        return source.times[-1] if source is not None and source.times else None
+
+    def downsample(self, name: str, start: float, end: float, width: int) -> list[Bucket]:
+        """Reduce samples in [start, end] to `width` (min, max) buckets, None before the first sample."""
+        buckets: list[Bucket] = [None] * width
+        source = self.sources.get(name)
+        if source is None or end <= start or width <= 0:
+            return buckets
+
+        span = (end - start) / width
+        index = bisect_left(source.times, start)
+        carry = source.values[index - 1] if index > 0 else None
+
+        for bucket in range(width):
+            bucket_end = start + (bucket + 1) * span
+            low = high = carry
+            while index < len(source.times) and (source.times[index] < bucket_end or bucket == width - 1):
+                if source.times[index] > end:
+                    break
+                value = source.values[index]
+                low = value if low is None else min(low, value)
+                high = value if high is None else max(high, value)
+                carry = value
+                index += 1
+
+            if low is not None and high is not None:
+                buckets[bucket] = (low, high)
+
+        return buckets
@@ -1,7 +1,11 @@
 import json
 import logging
+import os
+import time
 from dataclasses import dataclass, field
-from typing import Any, Tuple
+from typing import Any, Optional, Tuple
+
+from app.status.sampling import RollingVariance, threshold_activity
 
 logger = logging.getLogger(__name__)
 
@@ -25,14 +29,19 @@ class JSONStatus:
     file_path: str
     fields: list[JSONField]
     last_reported_value: dict[str, Any] = field(default_factory=dict)
+    stats: dict[str, RollingVariance] = field(default_factory=dict)
+    updated_at: dict[str, float] = field(default_factory=dict)
 
     def __init__(self, file_path: str, fields: list[JSONField]):
         self.last_reported_value = {}
+        self.stats = {}
+        self.updated_at = {}
         self.file_path = file_path
         self.fields = fields
 
         for j_field in self.fields:
             self.last_reported_value[j_field.name] = j_field.value
+            self.stats[j_field.name] = RollingVariance()
 
     def _percent(self, j_field: JSONField) -> float:
         return (j_field.value - j_field.percent_min) / (j_field.percent_max - j_field.percent_min) * 100
@@ -90,6 +99,29 @@ class JSONStatus:
         logger.debug("Field %s not changed", j_field.name)
         return False
 
+    def find_field(self, name: str) -> Optional[JSONField]:
+        for j_field in self.fields:
+            if j_field.name == name:
+                return j_field
+        return None
+
+    def numeric_value(self, j_field: JSONField) -> Optional[float]:
+        if isinstance(j_field.value, bool) or not isinstance(j_field.value, (int, float)):
+            return None
+        return float(j_field.value)
+
+    def numeric_percent(self, j_field: JSONField) -> Optional[float]:
+        if not j_field.have_percent or self.numeric_value(j_field) is None:
+            return None
+        return self._percent(j_field)
+
+    def fresh_value(self, j_field: JSONField, percent: bool, max_age: float) -> Optional[float]:
+        """Numeric value or percent, None when the exporter has not refreshed it within `max_age` seconds."""
+        updated_at = self.updated_at.get(j_field.name)
+        if updated_at is None or time.time() - updated_at > max_age:
+            return None
+        return self.numeric_percent(j_field) if percent else self.numeric_value(j_field)
+
     def update_status(self) -> Tuple[bool, list[str]]:
         updated = False
         triggered_by = []
@@ -97,14 +129,23 @@ class JSONStatus:
         try:
             with open(self.file_path, "r") as file:
                 data = json.load(file)
+                # Exporter timestamp if it writes one, otherwise the time the file was last written
+                data_time = data.get("Timestamp")
+                if isinstance(data_time, bool) or not isinstance(data_time, (int, float)):
+                    data_time = os.fstat(file.fileno()).st_mtime
 
                 for j_field in self.fields:
                     if j_field.field in data:
+                        self.updated_at[j_field.name] = data_time
                         if j_field.value != data[j_field.field]:
                             j_field.value = data[j_field.field]
                             if self._value_changed(j_field):
                                 updated = True
                                 triggered_by.append(j_field.name)
+
+                        current = self.numeric_percent(j_field) if j_field.have_percent else self.numeric_value(j_field)
+                        if current is not None:
+                            self.stats[j_field.name].add(current)
                     else:
                         logger.error("Field %s not found in file %s", j_field.field, self.file_path)
 
@@ -114,6 +155,43 @@ class JSONStatus:
 
         return (updated, triggered_by)
 
+    def _can_report(self, j_field: JSONField) -> bool:
+        # Mirrors _value_changed: a plain value with a report step is reported even without report_on_change
+        return j_field.report_on_change or (not j_field.have_percent and j_field.report_on_change_value is not None)
+
+    def activity(self) -> float:
+        activity = 0.0
+        for j_field in self.fields:
+            # Display-only fields never trigger a report, so they must not keep the source busy
+            if not self._can_report(j_field) or j_field.value is None:
+                continue
+
+            threshold = j_field.report_on_change_value
+            if threshold is None and not j_field.have_percent:
+                # Every change is reported (flags, states, counters): edges can't be anticipated, sample at full rate
+                return 1.0
+
+            stats = self.stats[j_field.name]
+            current = self.numeric_percent(j_field) if j_field.have_percent else self.numeric_value(j_field)
+            reported = self.last_reported_value[j_field.name]
+            if current is None or stats.mean is None or not isinstance(reported, (int, float)):
+                continue
+
+            if threshold is None:
+                # _percent_changed reports moves of 0.1 percentage points
+                threshold = 0.1
+            activity = max(activity, threshold_activity(stats, current - reported, threshold))
+
+        return activity
+
+    def numeric_samples(self) -> list[tuple[str, float]]:
+        samples = []
+        for j_field in self.fields:
+            value = self.numeric_value(j_field)
+            if value is not None:
+                samples.append((j_field.name, value))
+        return samples
+
     def text_status(self) -> list[tuple[str, str]]:
         status = []
         for j_field in self.fields:
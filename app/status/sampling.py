@@ -0,0 +1,57 @@
+import math
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass
+class RollingVariance:
+    """Exponentially weighted mean and variance, O(1) per value."""
+
+    alpha: float = 0.2
+    mean: Optional[float] = None
+    variance: float = 0.0
+
+    def add(self, value: float) -> None:
+        if self.mean is None:
+            self.mean = value
+            return
+
+        diff = value - self.mean
+        increment = self.alpha * diff
+        self.mean += increment
+        self.variance = (1 - self.alpha) * (self.variance + diff * increment)
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+
+def threshold_activity(stats: RollingVariance, distance: float, threshold: float) -> float:
+    """How close a value is to being reported: movement and distance to the report step, in [0, 1]."""
+    if threshold <= 0:
+        return 1.0
+    return min(1.0, max(stats.std, abs(distance)) / threshold)
+
+
+@dataclass
+class AdaptiveSampler:
+    min_interval: float
+    max_interval: float
+    backoff: float = 1.5
+    interval: float = 0.0
+    next_due: float = 0.0
+
+    def __post_init__(self):
+        self.interval = self.min_interval
+
+    def due(self, now: float) -> bool:
+        return now >= self.next_due
+
+    def schedule(self, now: float, activity: float) -> None:
+        # Speed up at once when the source moves, back off gradually when it is quiet
+        target = self.max_interval - min(max(activity, 0.0), 1.0) * (self.max_interval - self.min_interval)
+        if target < self.interval:
+            self.interval = target
+        else:
+            self.interval = min(target, self.interval * self.backoff)
+        self.next_due = now + self.interval
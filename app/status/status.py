@@ -2,17 +2,24 @@ import asyncio
 import json
 import logging
 import math
+import time
 from collections import defaultdict
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Any, Callable, Coroutine, Tuple
+from functools import partial
+from typing import Any, Callable, Coroutine, Optional, Tuple
 
 import RPi.GPIO as GPIO
 from ina219 import INA219
 
 from app.status.ats_status import ATSStatus
+from app.status.energy import (BatteryEstimator, EnergyAccountant, EnergyMeter,
+                               Probe)
 from app.status.gpio_status import GPIOStatus
+from app.status.history import SampleHistory
 from app.status.json_status import JSONField, JSONStatus
+from app.status.sampling import (AdaptiveSampler, RollingVariance,
+                                 threshold_activity)
 from app.utils import SingletonMeta
 
 logger = logging.getLogger(__name__)
@@ -27,6 +34,7 @@ class Voltage219Status:
 
     __ina: INA219
     __reported_voltage_percent: float
+    __stats: RollingVariance
 
     def __init__(self, voltage: float, name: str, shunt_ohms: float, address: int):
         self.voltage = voltage
@@ -37,6 +45,7 @@ class Voltage219Status:
         self.__ina = INA219(shunt_ohms, busnum=0x1, address=address)
         self.__ina.configure()
         self.__reported_voltage_percent = 0
+        self.__stats = RollingVariance()
 
     def percent(self) -> float:
         a = 13.3
@@ -50,6 +59,7 @@ class Voltage219Status:
 
         voltage_status = self.__ina.voltage()
         self.voltage = voltage_status
+        self.__stats.add(self.percent())
 
         delta = self.__reported_voltage_percent - self.percent()
         if abs(delta) > 10:
@@ -58,6 +68,12 @@ class Voltage219Status:
 
         return (updated, [])
 
+    def activity(self) -> float:
+        return threshold_activity(self.__stats, self.percent() - self.__reported_voltage_percent, 10)
+
+    def numeric_samples(self) -> list[tuple[str, float]]:
+        return [(self.name, self.voltage)]
+
 
 @dataclass
 class VoltageJSONStatus:
@@ -69,6 +85,7 @@ class VoltageJSONStatus:
     max_voltage: float
 
     __reported_voltage_percent: float
+    __stats: RollingVariance
 
     def __init__(self, voltage: float, name: str, file_name: str, field_name: str, min_voltage: float, max_voltage: float):
         self.voltage = voltage
@@ -80,6 +97,7 @@ class VoltageJSONStatus:
         self.max_voltage = max_voltage
 
         self.__reported_voltage_percent = 0
+        self.__stats = RollingVariance()
 
     def percent(self) -> float:
         return 100.0 * (self.voltage - self.min_voltage) / (self.max_voltage - self.min_voltage)
@@ -101,6 +119,7 @@ class VoltageJSONStatus:
             return (False, [])
 
         self.voltage = voltage_status
+        self.__stats.add(self.percent())
 
         delta = self.__reported_voltage_percent - self.percent()
         if abs(delta) > 10:
@@ -109,14 +128,37 @@ class VoltageJSONStatus:
 
         return (updated, [])
 
+    def activity(self) -> float:
+        return threshold_activity(self.__stats, self.percent() - self.__reported_voltage_percent, 10)
+
+    def numeric_samples(self) -> list[tuple[str, float]]:
+        return [(self.name, self.voltage)]
+
     def str_status(self) -> str:
         return f"{self.voltage} (~{self.percent()}%)"
 
 
 class Status(metaclass=SingletonMeta):
     statuses: dict[str, list[Any]]
+    energy: Optional[EnergyAccountant]
+    sync_interval: float
+    samplers: dict[int, AdaptiveSampler]
+    history: SampleHistory
+    version: int
+    changed_at: dict[tuple[str, str], float]
+    change_listeners: list[Callable[[], None]]
+    section_providers: list[Callable[[], list[tuple[str, list[tuple[str, str]]]]]]
     on_update: Callable[[list[str]], Coroutine[Any, Any, None]]
 
+    def __init__(self) -> None:
+        self.version = 0
+        self.samplers = {}
+        self.history = SampleHistory()
+        self.changed_at = {}
+        self.change_listeners = []
+        self.section_providers = []
+        self.__rows: list[tuple[str, str, str]] = []
+
     def _create_gpio_status(self, status: dict):
         port = status.get("gpio_port")
         if port is None:
@@ -212,11 +254,103 @@ class Status(metaclass=SingletonMeta):
 
         return value
 
+    def _create_sampler(self, sampling: dict):
+        # Without a "sampling" section every source is read at the fixed sync_interval
+        return AdaptiveSampler(
+            float(sampling.get("min_interval", self.sync_interval)),
+            float(sampling.get("max_interval", self.sync_interval)),
+            float(sampling.get("backoff", 1.5))
+        )
+
+    def _json_field_probe(self, name: Any, percent: bool, max_age: float) -> Optional[Probe]:
+        for statuses in self.statuses.values():
+            for status in statuses:
+                if not isinstance(status, JSONStatus):
+                    continue
+
+                j_field = status.find_field(str(name))
+                if j_field is not None:
+                    return partial(status.fresh_value, j_field, percent, max_age)
+
+        logger.error("JSON field %s is not defined", name)
+        return None
+
+    def _json_field_has_percent(self, name: Any) -> bool:
+        for statuses in self.statuses.values():
+            for status in statuses:
+                if isinstance(status, JSONStatus):
+                    j_field = status.find_field(str(name))
+                    if j_field is not None:
+                        return j_field.have_percent
+        return False
+
+    def _create_energy_meter(self, meter: dict, max_age: float):
+        probe = self._json_field_probe(meter.get("field"), False, max_age)
+        if probe is None:
+            logger.error("Cannot create energy meter %s, field is invalid.", meter.get("name"))
+            return None
+
+        return EnergyMeter(str(meter.get("name")), probe)
+
+    def _create_battery_estimator(self, battery: dict, max_age: float):
+        if not self._json_field_has_percent(battery.get("percent_field")):
+            logger.error("Cannot create battery estimator, percent_field %s has no have_percent.",
+                         battery.get("percent_field"))
+            return None
+
+        probe = self._json_field_probe(battery.get("percent_field"), True, max_age)
+        if probe is None:
+            logger.error("Cannot create battery estimator, percent_field is invalid.")
+            return None
+
+        return BatteryEstimator(
+            str(battery.get("name", "Runtime")),
+            probe,
+            float(battery.get("time_constant", 900))
+        )
+
+    def _create_energy(self, energy: Optional[dict]):
+        if energy is None:
+            return None
+
+        max_gap = float(energy.get("max_gap", max([60.0] + [2 * s.max_interval for s in self.samplers.values()])))
+        # Readings older than this are treated as missing, so a dead exporter stops the counters
+        max_age = float(energy.get("max_age", max_gap))
+
+        meters = []
+        for meter_content in energy.get("meters", []):
+            meter = self._create_energy_meter(meter_content, max_age)
+            if meter is None:
+                self.statuses_fail.append(meter_content.get("name"))
+            else:
+                meters.append(meter)
+
+        battery = None
+        battery_content = energy.get("battery")
+        if battery_content is not None:
+            battery = self._create_battery_estimator(battery_content, max_age)
+            if battery is None:
+                self.statuses_fail.append(battery_content.get("name", "Runtime"))
+
+        return EnergyAccountant(
+            meters,
+            battery,
+            energy.get("checkpoint_path"),
+            float(energy.get("checkpoint_interval", 300)),
+            max_gap
+        )
+
     def parse_config(self, config_path: str):
         config_data = json.load(open(config_path, "r"))
         self.statuses = defaultdict(list)
         self.statuses_fail = []
+        self.sync_interval = float(config_data.get("sync_interval", 5))
+        self.samplers = {}
 
+        history = config_data.get("history", {})
+        self.history = SampleHistory(int(history.get("capacity", 10000)), float(history.get("heartbeat", 60)))
+
+        sampling = config_data.get("sampling", {})
         statuses_list = config_data.get("statuses", [])
         for status in statuses_list:
             value = self._create_status(status)
@@ -225,6 +359,10 @@ class Status(metaclass=SingletonMeta):
                 self.statuses_fail.append(status.get("name"))
             else:
                 self.statuses[status.get("group")].append(value)
+                self.samplers[id(value)] = self._create_sampler({**sampling, **status.get("sampling", {})})
+
+        self.energy = self._create_energy(config_data.get("energy"))
+        self._track_changes()
 
     def init(self, config_path: str):
         logger.info("Initializing Status class")
@@ -253,14 +391,69 @@ class Status(metaclass=SingletonMeta):
         updated = False
         triggered_by = []
 
+        now = time.monotonic()
+        wall_time = time.time()
         for _, statuses in self.statuses.items():
             for status in statuses:
+                sampler = self.samplers[id(status)]
+                if not sampler.due(now):
+                    continue
+
                 upd, trd = status.update_status()
                 updated |= upd
                 triggered_by.extend(trd)
+                sampler.schedule(now, status.activity())
+
+                for name, value in status.numeric_samples():
+                    self.history.record(name, wall_time, value)
+
+        if self.energy is not None:
+            self.energy.sample(now)
+
+        self._track_changes()
 
         return (updated, triggered_by)
 
+    def next_sync_delay(self) -> float:
+        if not self.samplers:
+            return self.sync_interval
+
+        next_due = min(sampler.next_due for sampler in self.samplers.values())
+        return max(next_due - time.monotonic(), 0.01)
+
+    def add_change_listener(self, listener: Callable[[], None]) -> None:
+        self.change_listeners.append(listener)
+
+    def add_section_provider(self, provider: Callable[[], list[tuple[str, list[tuple[str, str]]]]]) -> None:
+        self.section_providers.append(provider)
+
+    def status_rows(self) -> list[tuple[str, str, str]]:
+        rows = []
+        for group, statuses in self.statuses.items():
+            for status in statuses:
+                for name, value in status.text_status():
+                    rows.append((group, name, value))
+        return rows
+
+    def _track_changes(self) -> None:
+        rows = self.status_rows()
+        if rows == self.__rows:
+            return
+
+        now = time.time()
+        previous = {(group, name): value for group, name, value in self.__rows}
+        for group, name, value in rows:
+            if previous.get((group, name)) != value:
+                self.changed_at[(group, name)] = now
+
+        self.__rows = rows
+        self.version += 1
+        for listener in self.change_listeners:
+            try:
+                listener()
+            except Exception as err:
+                logger.error("Error in status change listener: %s", err)
+
     # Power ⚡️
     #   Main        ✅
     #   Generator   ❌
@@ -280,6 +473,17 @@ class Status(metaclass=SingletonMeta):
                 for name, value in status.text_status():
                     lines.append(f"   {name:10}   {value}")
 
+        if self.energy is not None:
+            lines.append("Energy")
+            for name, value in self.energy.text_status():
+                lines.append(f"   {name:10}   {value}")
+
+        for provider in self.section_providers:
+            for header, rows in provider():
+                lines.append(header)
+                for name, value in rows:
+                    lines.append(f"   {name:10}   {value}")
+
         # for v_id in range(len(self.voltage_statuses)):
         #     voltage = self.voltage_statuses[v_id]
         #     lines.append(f"   {voltage.name:12}  {voltage.voltage} (~{voltage.percent()}%)")
@@ -295,6 +499,16 @@ class Status(metaclass=SingletonMeta):
         lines.append('```')
         return "\n".join(lines)
 
+    def generate_energy_msg(self) -> str:
+        if self.energy is None:
+            return "Energy accounting is not configured"
+
+        lines = ['```']
+        for name, value in self.energy.text_status():
+            lines.append(f"   {name:10}   {value}")
+        lines.append('```')
+        return "\n".join(lines)
+
     async def __sync_status(self):
         while True:
             upd, trb = self.sync_status()
@@ -303,4 +517,4 @@ class Status(metaclass=SingletonMeta):
                     await self.on_update(trb)
                 except Exception as err:
                     logger.error("Error during on_update(): %s", err)
-            await asyncio.sleep(5)
+            await asyncio.sleep(self.next_sync_delay())
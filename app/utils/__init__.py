@@ -1,3 +1,4 @@
+from .http_server import HTTPHandler, HTTPRequest, HTTPResponse, HTTPServer
 from .singleton_meta import SingletonMeta
 
-__all__ = ['SingletonMeta']
+__all__ = ['SingletonMeta', 'HTTPServer', 'HTTPRequest', 'HTTPResponse', 'HTTPHandler']
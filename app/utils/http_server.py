@@ -0,0 +1,160 @@
+import asyncio
+import logging
+import os
+import stat
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Optional
+from urllib.parse import parse_qsl, urlsplit
+
+logger = logging.getLogger(__name__)
+
+REASONS = {
+    200: "OK",
+    304: "Not Modified",
+    400: "Bad Request",
+    401: "Unauthorized",
+    403: "Forbidden",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+    503: "Service Unavailable",
+}
+
+
+@dataclass
+class HTTPRequest:
+    method: str
+    path: str
+    query: dict[str, str]
+    headers: dict[str, str]
+    body: bytes
+
+
+@dataclass
+class HTTPResponse:
+    status: int
+    body: bytes = b''
+    content_type: str = 'application/json'
+    headers: dict[str, str] = field(default_factory=dict)
+
+    def encode(self, keep_alive: bool) -> bytes:
+        lines = [f"HTTP/1.1 {self.status} {REASONS.get(self.status, 'Unknown')}"]
+        if self.status != 304:
+            lines.append(f"Content-Type: {self.content_type}")
+        lines.append(f"Content-Length: {len(self.body)}")
+        lines.append(f"Connection: {'keep-alive' if keep_alive else 'close'}")
+        for name, value in self.headers.items():
+            lines.append(f"{name}: {value}")
+
+        return ("\r\n".join(lines) + "\r\n\r\n").encode('latin-1') + self.body
+
+
+HTTPHandler = Callable[[HTTPRequest], Awaitable[HTTPResponse]]
+
+
+class HTTPServer:
+    """Minimal asyncio HTTP/1.1 server with keep-alive, enough for small local JSON endpoints.
+
+    Only `Content-Length` bodies are supported; chunked requests are rejected.
+    """
+
+    def __init__(self, handler: HTTPHandler, max_body_size: int = 1 << 20, idle_timeout: float = 75):
+        self.handler = handler
+        self.max_body_size = max_body_size
+        self.idle_timeout = idle_timeout
+
+        self.__server: Optional[asyncio.Server] = None
+        self.__clients: set[asyncio.Task] = set()
+
+    async def start(self, host: str, port: int) -> None:
+        self.__server = await asyncio.start_server(self.__serve, host, port)
+        logger.info("HTTP server listening on %s:%s", host, self.port)
+
+    async def start_unix(self, path: str) -> None:
+        # A socket left behind by a previous run would make the bind fail
+        if os.path.exists(path) and stat.S_ISSOCK(os.stat(path).st_mode):
+            os.unlink(path)
+        self.__server = await asyncio.start_unix_server(self.__serve, path)
+        logger.info("HTTP server listening on %s", path)
+
+    @property
+    def port(self) -> Optional[int]:
+        if self.__server is None or not self.__server.sockets:
+            return None
+
+        address = self.__server.sockets[0].getsockname()
+        return address[1] if isinstance(address, tuple) else None
+
+    async def stop(self) -> None:
+        if self.__server is None:
+            return
+
+        self.__server.close()
+        for task in list(self.__clients):
+            task.cancel()
+        await asyncio.gather(*self.__clients, return_exceptions=True)
+        await self.__server.wait_closed()
+        self.__server = None
+        logger.info("HTTP server stopped")
+
+    async def __read_request(self, reader: asyncio.StreamReader) -> Optional[HTTPRequest]:
+        try:
+            head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), self.idle_timeout)
+        except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+            return None
+
+        request_line, *header_lines = head.decode('latin-1').split("\r\n")
+        method, target, _version = request_line.split(" ", 2)
+
+        headers = {}
+        for line in header_lines:
+            if line:
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+
+        if 'transfer-encoding' in headers:
+            raise ValueError("Chunked request bodies are not supported")
+
+        length = int(headers.get('content-length', 0))
+        if length > self.max_body_size:
+            raise OverflowError(f"Request body of {length} bytes is too large")
+        body = await reader.readexactly(length) if length else b''
+
+        url = urlsplit(target)
+        return HTTPRequest(method.upper(), url.path, dict(parse_qsl(url.query)), headers, body)
+
+    async def __serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        task = asyncio.current_task()
+        if task is not None:
+            self.__clients.add(task)
+
+        try:
+            while True:
+                keep_alive = True
+                try:
+                    request = await self.__read_request(reader)
+                    if request is None:
+                        break
+                    keep_alive = request.headers.get('connection', '').lower() != 'close'
+                    response = await self.handler(request)
+                except OverflowError as e:
+                    logger.warning("Rejected HTTP request: %s", e)
+                    response, keep_alive = HTTPResponse(413), False
+                except (ValueError, asyncio.LimitOverrunError, asyncio.IncompleteReadError) as e:
+                    logger.warning("Malformed HTTP request: %s", e)
+                    response, keep_alive = HTTPResponse(400), False
+                except Exception as e:
+                    logger.error("Error handling HTTP request: %s", e)
+                    response = HTTPResponse(500)
+
+                writer.write(response.encode(keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            if task is not None:
+                self.__clients.discard(task)
+            writer.close()
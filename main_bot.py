@@ -4,8 +4,10 @@ import time
 
 import requests
 
+from app.api import StatusAPI
 from app.bot import Bot
 from app.config import Config
+from app.sites import SiteAgent, SiteAggregator
 from app.status import Status
 
 
@@ -20,16 +22,29 @@ def main_bot():
     app_dir = os.path.dirname(os.path.realpath(__file__))
     Status().init(os.path.join(app_dir, "config.json"))
 
+    if Config.status_api_port > 0 or Config.status_api_socket:
+        StatusAPI().start_serving()
+
     if Config.environment == 'local':
         Status().start_monitoring(print_status)
         asyncio.get_event_loop().run_forever()
+    elif Config.site_mode == 'agent':
+        # Headless site: no Telegram connection, state goes to the aggregator
+        SiteAgent().start()
+        Status().start_monitoring(SiteAgent().on_update)
+        asyncio.get_event_loop().run_forever()
     else:
+        if Config.site_mode == 'aggregator':
+            SiteAggregator().start_serving()
         Status().start_monitoring(Bot().send_status_update)
         Bot().start()
 
 
 def exit_bot():
-    if Config.environment != 'local':
+    if Status().energy is not None:
+        Status().energy.checkpoint()
+
+    if Config.environment != 'local' and Config.site_mode != 'agent':
         Bot().stop()
 
 
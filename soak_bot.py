@@ -0,0 +1,55 @@
+import argparse
+import asyncio
+import logging
+import sys
+import tempfile
+
+from app.soak import Phase, SoakHarness
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Edge-to-delivery latency soak test against a local fake Bot API")
+    parser.add_argument('--phase', action='append', type=Phase.parse, default=None,
+                        help="DURATION:RATE, seconds and events per second; repeat for a scripted storm")
+    parser.add_argument('--gpio', type=int, default=4, help="number of simulated GPIO inputs")
+    parser.add_argument('--json-fields', type=int, default=2, help="number of simulated JSON fields")
+    parser.add_argument('--chats', type=int, default=1, help="number of notify chats")
+    parser.add_argument('--sync-interval', type=float, default=0.05, help="status sampling interval in seconds")
+    parser.add_argument('--warmup', type=float, default=5, help="seconds before the memory baseline is taken")
+    parser.add_argument('--report-interval', type=float, default=60, help="seconds between progress reports")
+    parser.add_argument('--trace-memory', action='store_true', help="measure heap growth with tracemalloc")
+    parser.add_argument('--max-p99', type=float, default=None, help="fail if p99 latency exceeds this many ms")
+    parser.add_argument('--max-growth', type=float, default=None, help="fail if traced heap grows by more KiB")
+    parser.add_argument('--seed', type=int, default=0)
+    return parser.parse_args()
+
+
+def main_soak() -> int:
+    args = parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        harness = SoakHarness(work_dir, args.gpio, args.json_fields, args.sync_interval, args.chats,
+                              args.trace_memory, args.seed)
+        report = asyncio.run(harness.run(args.phase or [Phase(60, 2)], args.warmup, args.report_interval,
+                                         on_report=lambda progress: print(progress, flush=True)))
+
+    print(report)
+
+    failed = False
+    p99 = report.latency.percentile(99)
+    if args.max_p99 is not None and p99 is not None and p99 * 1000 > args.max_p99:
+        print(f"p99 latency {p99 * 1000:.1f}ms exceeds {args.max_p99}ms")
+        failed = True
+    if args.max_growth is not None and report.memory_growth is not None and report.memory_growth / 1024 > args.max_growth:
+        print(f"traced heap grew by {report.memory_growth / 1024:.1f}KiB, limit {args.max_growth}KiB")
+        failed = True
+    if report.pending > 0:
+        print(f"{report.pending} edges were never delivered")
+        failed = True
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main_soak())